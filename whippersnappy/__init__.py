@@ -1,2 +1,14 @@
 from ._version import __version__  # noqa: F401
 from .utils._config import sys_info  # noqa: F401
+
+# rendering functions are imported on first access, so that importing the
+# package does not load OpenGL, GLFW and pyrr
+_LAZY_CORE = ("close_context", "snap4", "snap_session")
+
+
+def __getattr__(name):
+    if name in _LAZY_CORE:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -22,6 +22,7 @@ Usage:
 """
 
 import argparse
+import logging
 import math
 import os
 import signal
@@ -40,8 +41,11 @@ from whippersnappy.core import (
     prepare_geometry,
     setup_shader,
     snap4,
+    update_geometry,
 )
 
+logger = logging.getLogger(__name__)
+
 # Global variables for config app configuration state:
 current_fthresh_ = None
 current_fmax_ = None
@@ -99,11 +103,11 @@ def show_window(
         return False
 
     if surfname is None:
-        print("[INFO] No surf_name provided. Looking for options in surf directory...")
+        logger.info("No surf_name provided. Looking for options in surf directory...")
         found_surfname = get_surf_name(sdir, hemi)
         if found_surfname is None:
-            print(
-                f"[ERROR] Could not find a valid surf file in {sdir} for hemi: {hemi}!"
+            logger.error(
+                "Could not find a valid surf file in %s for hemi: %s!", sdir, hemi
             )
             sys.exit(0)
         meshpath = os.path.join(sdir, "surf", hemi + "." + found_surfname)
@@ -129,6 +133,7 @@ def show_window(
         meshpath, overlaypath, curvpath, labelpath, current_fthresh_, current_fmax_
     )
     shader = setup_shader(meshdata, triangles, wwidth, weight, specular=specular)
+    transformLoc = gl.glGetUniformLocation(shader, "transform")
 
     print()
     print("Keys:")
@@ -163,11 +168,9 @@ def show_window(
                     current_fthresh_,
                     current_fmax_,
                 )
-                shader = setup_shader(
-                    meshdata, triangles, wwidth, weight, specular=specular
-                )
+                # keep program and uniforms, only replace the mesh
+                update_geometry(meshdata, triangles)
 
-        transformLoc = gl.glGetUniformLocation(shader, "transform")
         gl.glUniformMatrix4fv(transformLoc, 1, gl.GL_FALSE, rot_y * viewLeft)
 
         if glfw.get_key(window, glfw.KEY_RIGHT) == glfw.PRESS:
@@ -193,6 +196,11 @@ def config_app_exit_handler():
 def run():
     global current_fthresh_, current_fmax_, app_, app_window_
 
+    # messages go to stdout, where they were printed before
+    logging.basicConfig(
+        level=logging.INFO, format="[%(levelname)s] %(message)s", stream=sys.stdout
+    )
+
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "-lh",
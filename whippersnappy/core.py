@@ -1,7 +1,7 @@
 """Contains the core functionalities of WhipperSnapPy.
 
 Dependencies:
-    numpy, glfw, pyrr, PyOpenGL, pillow
+    numpy, glfw, PyOpenGL, pillow
 
 @Author    : Martin Reuter
 @Created   : 27.02.2022
@@ -9,19 +9,68 @@ Dependencies:
 
 """
 
-import math
+import atexit
+import concurrent.futures
+import functools
+import logging
 import os
 import sys
+import threading
 
 import glfw
 import numpy as np
 import OpenGL.GL as gl
 import OpenGL.GL.shaders as shaders
-import pyrr
 from PIL import Image, ImageDraw, ImageFont
 
 from .read_geometry import read_geometry, read_mgh_data, read_morph_data
 
+logger = logging.getLogger(__name__)
+
+# View matrices follow pyrr's row-vector convention (translation in the last
+# row) and are uploaded untransposed, so "A then B" is the product A @ B.
+# Stored as C-contiguous float32, their memory layout already is the
+# column-major one OpenGL expects, and PyOpenGL passes them without a copy.
+# Lateral view of the left hemisphere: -90 deg around z, then 90 deg around x.
+_VIEW_LEFT = np.array(
+    [[0, 0, -1, 0], [-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=np.float32
+)
+# Lateral view of the right hemisphere: additionally 180 deg around y.
+_VIEW_RIGHT = np.array(
+    [[0, 0, 1, 0], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=np.float32
+)
+# Shift towards the camera, applied after the rotation for the lateral views.
+_TRANSL = np.array(
+    [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0.4, 1]], dtype=np.float32
+)
+# Camera 5 units in front of the origin, and the (identity) model matrix.
+_CAMERA = np.array(
+    [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, -5, 1]], dtype=np.float32
+)
+_MODEL = np.identity(4, dtype=np.float32)
+# snap4 tiles: lateral views (shifted towards the camera) and medial views
+_VIEW_LH_LATERAL = _VIEW_LEFT @ _TRANSL
+_VIEW_LH_MEDIAL = _VIEW_RIGHT
+_VIEW_RH_LATERAL = _VIEW_RIGHT @ _TRANSL
+_VIEW_RH_MEDIAL = _VIEW_LEFT
+# the matrices are shared by all snapshots, so they must never change
+for _matrix in (
+    _VIEW_LEFT,
+    _VIEW_RIGHT,
+    _TRANSL,
+    _CAMERA,
+    _MODEL,
+    _VIEW_LH_LATERAL,
+    _VIEW_RH_LATERAL,
+):
+    _matrix.setflags(write=False)
+del _matrix
+
+# font shipped with the package, used when no font_file is given
+_ROBOTO_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Roboto-Regular.ttf"
+)
+
 
 def normalize_mesh(v, scale=1.0):
     """
@@ -121,28 +170,21 @@ def heat_color(values, invert=False):
     # values (1 dim array length n) will receive gradient between -1 and 1
     # nan will return (nan,nan,nan)
     # returns colors (r,g,b)  as n x 3 array
-    if invert:
-        values = -1.0 * values
     vabs = np.abs(values)
-    colors = np.zeros((vabs.size, 3), dtype=np.float32)
-    crb = 0.5625 + 3 * 0.4375 * vabs
-    cg = 1.5 * (vabs - (1.0 / 3.0))
-    n1 = values < -1.0
-    nm = (values >= -1.0) & (values < -(1.0 / 3.0))
-    n0 = (values >= -(1.0 / 3.0)) & (values < 0)
-    p0 = (values >= 0) & (values < (1.0 / 3.0))
-    pm = (values >= (1.0 / 3.0)) & (values < 1.0)
-    p1 = values >= 1.0
-    # fill in colors for the 5 blocks
-    colors[n1, 1:3] = 1.0  # bright blue
-    colors[nm, 1] = cg[nm]  # cg increasing green channel
-    colors[nm, 2] = 1.0  # and keeping blue on full
-    colors[n0, 2] = crb[n0]  # crb increasing blue channel
-    colors[p0, 0] = crb[p0]  # crb increasing red channel
-    colors[pm, 1] = cg[pm]  # cg increasing green channel
-    colors[pm, 0] = 1.0  # and keeping red on full
-    colors[p1, 0:2] = 1.0  # yellow
-    colors[np.isnan(values), :] = np.nan
+    colors = np.empty((vabs.size, 3), dtype=np.float32)
+    # closed form of the piecewise linear map: the main channel (red for
+    # positive, blue for negative values) ramps from 0.5625 at 0 to full at
+    # 1/3, green ramps from 0 at 1/3 to full at 1; nan propagates to all
+    main = np.minimum(0.5625 + 3 * 0.4375 * vabs, 1.0)
+    green = np.clip(1.5 * (vabs - (1.0 / 3.0)), 0.0, 1.0)
+    # inverting swaps the sides instead of negating the values
+    if invert:
+        no_red, no_blue, saturated = values > 0, values <= 0, values <= -1.0
+    else:
+        no_red, no_blue, saturated = values < 0, values >= 0, values >= 1.0
+    colors[:, 0] = np.where(no_red, 0.0, main)
+    colors[:, 1] = np.where(saturated, 1.0, green)  # exact at 1 in float32
+    colors[:, 2] = np.where(no_blue, 0.0, main)
     return colors
 
 
@@ -175,7 +217,6 @@ def rescale_overlay(values, minval=None, maxval=None):
     neg: bool
         Whether negative values are present at all after cropping.
     """
-    valsign = np.sign(values)
     valabs = np.abs(values)
     realmin = np.min(values)
     if maxval is None:
@@ -183,17 +224,20 @@ def rescale_overlay(values, minval=None, maxval=None):
     if minval is None:
         minval = max(0.0, np.min(valabs))
     if maxval < 0 or minval < 0:
-        print("resacle_overlay ERROR: min and maxval should both be positive!")
-        exit(1)
+        logger.error("rescale_overlay: min and maxval should both be positive!")
+        sys.exit(1)
     # print("Using min {:.2f} and max {:.2f}".format(minval,maxval))
-    # rescale map symmetrically to -1 .. 1 (keeping minval at 0)
-    # mask values below minval
-    values[valabs < minval] = np.nan
+    # rescale map symmetrically to -1 .. 1 (keeping minval at 0),
+    # working in place on valabs to avoid temporaries:
     # shift towards 0 from both sides
-    values = values - valsign * minval
+    valabs -= minval
+    # mask values below minval
+    valabs[valabs < 0] = np.nan
+    # restore the sign
+    np.copysign(valabs, values, out=valabs)
     # rescale so that former maxval is at 1 (and -1 for negative values)
-    values = values / (maxval - minval)
-    return values, minval, maxval, (realmin < 0 and realmin < -minval)
+    valabs /= maxval - minval
+    return valabs, minval, maxval, (realmin < 0 and realmin < -minval)
 
 
 def binary_color(values, thres, color_low, color_high):
@@ -226,10 +270,34 @@ def binary_color(values, thres, color_low, color_high):
         color_low = np.array((color_low, color_low, color_low), dtype=np.float32)
     if np.isscalar(color_high):
         color_high = np.array((color_high, color_high, color_high), dtype=np.float32)
-    colors = np.empty((values.size, 3), dtype=np.float32)
-    colors[values < thres, :] = color_low
-    colors[values >= thres, :] = color_high
-    return colors
+    high = (values >= thres).reshape(-1, 1)
+    return np.where(high, color_high, color_low).astype(np.float32, copy=False)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_label_vertices(labelpath, stamp):
+    """
+    Read the vertex indices of a label file, cached across snapshots.
+
+    Batch jobs usually mask many overlays with the same (e.g. fsaverage
+    cortex) label, so the file is only parsed again if it changed.
+
+    Parameters
+    ----------
+    labelpath : str
+        Absolute path to label file.
+    stamp : tuple
+        Inode, size and modification time of the file (part of the cache
+        key), so a replaced file is read again even if it kept its mtime.
+
+    Returns
+    -------
+    maskvids: numpy.ndarray
+        Read-only array of vertex indices in the label.
+    """
+    maskvids = np.loadtxt(labelpath, dtype=int, skiprows=2, usecols=[0])
+    maskvids.setflags(write=False)
+    return maskvids
 
 
 def mask_label(values, labelpath=None):
@@ -254,7 +322,9 @@ def mask_label(values, labelpath=None):
     if not labelpath:
         return values
     # this is the mask of vertices to keep, e.g. cortex labels
-    maskvids = np.loadtxt(labelpath, dtype=int, skiprows=2, usecols=[0])
+    stat = os.stat(labelpath)
+    stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    maskvids = _read_label_vertices(labelpath, stamp)
     imask = np.ones(values.shape, dtype=bool)
     imask[maskvids] = False
     values[imask] = np.nan
@@ -300,7 +370,7 @@ def prepare_geometry(
         Concatenated array with vertex coords, vertex normals and colors
         as a (Nvert X 9) float32 array.
     triangles: numpy.ndarray
-        Triangle array as a (Ntria X 3) uint32 array.
+        Triangle array as a C-contiguous (Ntria X 3) uint32 array.
     fmin: float
         Minimum value of overlay function after rescale.
     fmax: float
@@ -311,10 +381,15 @@ def prepare_geometry(
 
     # read vertices and triangles
     surf = read_geometry(surfpath, read_metadata=False)
-    vertices = normalize_mesh(np.array(surf[0], dtype=np.float32), 1.85)
-    triangles = np.array(surf[1], dtype=np.uint32)
+    vertices = normalize_mesh(np.asarray(surf[0], dtype=np.float32), 1.85)
+    # contiguous uint32 as needed for the element buffer (no copy if it already is)
+    triangles = np.ascontiguousarray(surf[1], dtype=np.uint32)
+    # vertex coords, normals and colors are written straight into the
+    # interleaved (Nvert X 9) buffer that is uploaded to the GPU
+    vertexdata = np.empty((vertices.shape[0], 9), dtype=np.float32)
+    vertexdata[:, 0:3] = vertices
     # compute vertex normals
-    vnormals = np.array(vertex_normals(vertices, triangles), dtype=np.float32)
+    vertexdata[:, 3:6] = vertex_normals(vertices, triangles)
     # read curvature
     if curvpath:
         curv = read_morph_data(curvpath)
@@ -339,8 +414,7 @@ def prepare_geometry(
         colors[missing, :] = sulcmap[missing, :]
     else:
         colors = sulcmap
-    # concatenate matrices
-    vertexdata = np.concatenate((vertices, vnormals, colors), axis=1)
+    vertexdata[:, 6:9] = colors
     return vertexdata, triangles, fmin, fmax, neg
 
 
@@ -373,11 +447,13 @@ def init_window(width, height, title="PyOpenGL", visible=True):
     glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
     glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, True)
     glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
-    if not visible:
-        glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+    # set the hint either way, as hints persist for later windows
+    glfw.window_hint(glfw.VISIBLE, glfw.TRUE if visible else glfw.FALSE)
     window = glfw.create_window(width, height, title, None, None)
     if not window:
-        glfw.terminate()
+        # keep GLFW up for the windows of open sessions
+        if not _live_sessions:
+            glfw.terminate()
         return False
     # Enable key events
     glfw.set_input_mode(window, glfw.STICKY_KEYS, gl.GL_TRUE)
@@ -386,9 +462,343 @@ def init_window(width, height, title="PyOpenGL", visible=True):
     glfw.make_context_current(window)
     # vsync and glfw do not play nice.  when vsync is enabled mouse movement is jittery.
     glfw.swap_interval(0)
+    # context state shared by all renders: black background and depth testing
+    gl.glClearColor(0.0, 0.0, 0.0, 1.0)
+    gl.glEnable(gl.GL_DEPTH_TEST)
     return window
 
 
+class _GLSession:
+    """
+    Keep a GLFW window and its OpenGL context alive across several snapshots.
+
+    Creating and tearing down a context is expensive, so batch jobs can open
+    one session and pass it to repeated snapshot calls. Use as a context
+    manager; the window is destroyed on exit.
+
+    Parameters
+    ----------
+    width : int
+        Window width; snap4 renders into a 1080 x 900 window and resizes it
+        otherwise.
+    height : int
+        Window height.
+    title : str
+        Window title.
+    visible : bool
+        Window visibility.
+    """
+
+    def __init__(
+        self, width=1080, height=900, title="WhipperSnapPy 2.0", visible=False
+    ):
+        self.width = width
+        self.height = height
+        self.title = title
+        self.visible = visible
+        self.window = None
+        # shader program (and its buffers) set up by the first snapshot
+        self.shader = None
+        # readback buffer, reused while the framebuffer does not grow
+        self.pixels = None
+
+    def __enter__(self):
+        if not self.open():
+            raise RuntimeError("Could not create an OpenGL window/context.")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """
+        Create the window and make its context current (if not done yet).
+
+        Returns
+        -------
+        window: glfw.LP__GLFWwindow
+            GUI window, or False if it could not be created.
+        """
+        global _live_sessions
+        with _gl_lock:
+            if self.window is None:
+                window = init_window(self.width, self.height, self.title, self.visible)
+                if not window:
+                    return False
+                self.window = window
+                _live_sessions += 1
+                # do not keep the context bound to the creating thread
+                glfw.make_context_current(None)
+            return self.window
+
+    def close(self):
+        """Destroy the window and terminate GLFW if no other session is open."""
+        global _live_sessions
+        with _gl_lock:
+            if self.window is not None:
+                glfw.destroy_window(self.window)
+                self.window = None
+                self.shader = None
+                self.pixels = None
+                _live_sessions -= 1
+                # GLFW is shared by all windows, only the last session ends it
+                if not _live_sessions:
+                    glfw.terminate()
+
+    def resize(self, width, height):
+        """
+        Make the context current and resize the window if needed.
+
+        Parameters
+        ----------
+        width : int
+            Window width.
+        height : int
+            Window height.
+        """
+        # get_current_context only sees the calling thread, so the context is
+        # always made current here (snap4 releases it after each snapshot)
+        glfw.make_context_current(self.window)
+        if (width, height) != (self.width, self.height):
+            glfw.set_window_size(self.window, width, height)
+            self.width = width
+            self.height = height
+            fb_width, fb_height = glfw.get_framebuffer_size(self.window)
+            gl.glViewport(0, 0, fb_width, fb_height)
+
+    def snap4(self, *args, **kwargs):
+        """
+        Call :func:`snap4` reusing this session's window.
+
+        Parameters
+        ----------
+        *args : tuple
+            Positional arguments passed to :func:`snap4`.
+        **kwargs : dict
+            Keyword arguments passed to :func:`snap4`.
+        """
+        return snap4(*args, session=self, **kwargs)
+
+
+# hidden session shared by all snapshot calls that do not pass their own
+_default_session = None
+# GLFW is not thread-safe and a context is current in at most one thread:
+# creating, rendering with and closing any session is serialized, and the
+# context is released again afterwards, so the next use can come from any
+# thread (re-entrant, as close_context closes while holding the lock)
+_gl_lock = threading.RLock()
+# number of sessions with an open window, GLFW is terminated when it drops to 0
+_live_sessions = 0
+
+
+def _get_default_session(width, height):
+    """
+    Return the shared hidden session, creating it on first use.
+
+    The session stays open until :func:`close_context` is called or the
+    interpreter exits.
+
+    Parameters
+    ----------
+    width : int
+        Window width, if the session is created.
+    height : int
+        Window height, if the session is created.
+
+    Returns
+    -------
+    session: _GLSession
+        Open session, or None if no window/context could be created.
+    """
+    global _default_session
+    with _gl_lock:
+        if _default_session is None:
+            session = _GLSession(width, height, visible=False)
+            if not session.open():
+                return None
+            _default_session = session
+        return _default_session
+
+
+def close_context():
+    """
+    Close the shared hidden window used by snapshot calls without a session.
+
+    It is re-created by the next such call. Calling this is optional, the
+    window is closed at interpreter exit.
+    """
+    global _default_session
+    with _gl_lock:
+        session = _default_session
+        _default_session = None
+        if session is not None:
+            session.close()
+
+
+atexit.register(close_context)
+
+
+def snap_session(width=1080, height=900, title="WhipperSnapPy 2.0", visible=False):
+    """
+    Create a reusable OpenGL session for batch snapshots.
+
+    Example: ``with snap_session() as sess: sess.snap4(...)``.
+
+    Parameters
+    ----------
+    width : int
+        Window width; snap4 renders into a 1080 x 900 window and resizes it
+        otherwise.
+    height : int
+        Window height.
+    title : str
+        Window title.
+    visible : bool
+        Window visibility.
+
+    Returns
+    -------
+    session: _GLSession
+        Session to be used as a context manager.
+    """
+    return _GLSession(width, height, title, visible)
+
+
+# GLSL sources of the surface shader program
+_VERTEX_SHADER = """
+
+    #version 330
+
+    layout (location = 0) in vec3 aPos;
+    layout (location = 1) in vec3 aNormal;
+    layout (location = 2) in vec3 aColor;
+
+    out vec3 FragPos;
+    out vec3 Normal;
+    out vec3 Color;
+
+    uniform mat4 transform;
+    uniform mat4 model;
+    uniform mat4 view;
+    uniform mat4 projection;
+
+    void main()
+    {
+      gl_Position = projection * view * model * transform * vec4(aPos, 1.0f);
+      FragPos = vec3(model * transform * vec4(aPos, 1.0));
+      // normal matrix should be computed outside and passed!
+      Normal = mat3(transpose(inverse(view * model * transform))) * aNormal;
+      Color = aColor;
+    }
+
+"""
+
+_FRAGMENT_SHADER = """
+    #version 330
+
+    in vec3 Normal;
+    in vec3 FragPos;
+    in vec3 Color;
+
+    out vec4 FragColor;
+
+    uniform vec3 lightColor;
+    uniform bool doSpecular;
+
+    void main()
+    {
+      // ambient
+      float ambientStrength = 0.0;
+      vec3 ambient = ambientStrength * lightColor;
+
+      // diffuse
+      vec3 norm = normalize(Normal);
+      // key light (overhead)
+      vec3 lightPos1 = vec3(0.0,5.0,5.0);
+      vec3 lightDir = normalize(lightPos1 - FragPos);
+      float diff = max(dot(norm, lightDir), 0.0);
+      float key = 0.6;
+      vec3 diffuse = key * diff * lightColor;
+
+      // headlight (at camera)
+      vec3 lightPos2 = vec3(0.0,0.0,5.0);
+      lightDir = normalize(lightPos2 - FragPos);
+      vec3 ohlightDir = lightDir;
+      diff = max(dot(norm, lightDir), 0.0);
+      diffuse = diffuse + 0.68  * key * diff * lightColor;
+
+      // fill light (from below)
+      vec3 lightPos3 = vec3(0.0,-5.0,5.0);
+      lightDir = normalize(lightPos3 - FragPos);
+      diff = max(dot(norm, lightDir), 0.0);
+      diffuse = diffuse + 0.6  * key * diff * lightColor;
+
+      // left right back lights
+      vec3 lightPos4 = vec3(5.0,0.0,-5.0);
+      lightDir = normalize(lightPos4 - FragPos);
+      diff = max(dot(norm, lightDir), 0.0);
+      diffuse = diffuse + 0.52 * key * diff * lightColor;
+      vec3 lightPos5 = vec3(-5.0,0.0,-5.0);
+      lightDir = normalize(lightPos5 - FragPos);
+      diff = max(dot(norm, lightDir), 0.0);
+      diffuse = diffuse + 0.52 * key * diff * lightColor;
+
+      // specular
+      vec3 result;
+      if (doSpecular)
+      {
+        float specularStrength = 0.5;
+        // the viewer is always at (0,0,0) in view-space,
+        // so viewDir is (0,0,0) - Position => -Position
+        vec3 viewDir = normalize(-FragPos);
+        vec3 reflectDir = reflect(ohlightDir, norm);
+        float spec = pow(max(dot(viewDir, reflectDir), 0.0), 32);
+        vec3 specular = specularStrength * spec * lightColor;
+        // final color
+        result = (ambient + diffuse + specular) * Color;
+      }
+      else
+      {
+        // final color no specular
+        result = (ambient + diffuse) * Color;
+      }
+      FragColor = vec4(result, 1.0);
+    }
+
+"""
+
+
+def _perspective(fovy, aspect, near, far):
+    """
+    Create a perspective projection matrix (same layout as the view matrices).
+
+    Parameters
+    ----------
+    fovy : float
+        Vertical field of view in degrees.
+    aspect : float
+        Aspect ratio (width / height).
+    near : float
+        Distance to the near clipping plane.
+    far : float
+        Distance to the far clipping plane.
+
+    Returns
+    -------
+    projection: numpy.ndarray
+        Projection matrix (4 x 4, dtype: np.float32).
+    """
+    ymax = near * np.tan(np.radians(0.5 * fovy))
+    xmax = ymax * aspect
+    projection = np.zeros((4, 4), dtype=np.float32)
+    projection[0, 0] = near / xmax
+    projection[1, 1] = near / ymax
+    projection[2, 2] = -(far + near) / (far - near)
+    projection[2, 3] = -1.0
+    projection[3, 2] = -2.0 * far * near / (far - near)
+    return projection
+
+
 def setup_shader(meshdata, triangles, width, height, specular=True):
     """
     Create vertex and fragment shaders.
@@ -419,118 +829,16 @@ def setup_shader(meshdata, triangles, width, height, specular=True):
         Compiled OpenGL shader program.
     """
 
-    VERTEX_SHADER = """
-
-        #version 330
-
-        layout (location = 0) in vec3 aPos;
-        layout (location = 1) in vec3 aNormal;
-        layout (location = 2) in vec3 aColor;
-
-        out vec3 FragPos;
-        out vec3 Normal;
-        out vec3 Color;
-
-        uniform mat4 transform;
-        uniform mat4 model;
-        uniform mat4 view;
-        uniform mat4 projection;
-
-        void main()
-        {
-          gl_Position = projection * view * model * transform * vec4(aPos, 1.0f);
-          FragPos = vec3(model * transform * vec4(aPos, 1.0));
-          // normal matrix should be computed outside and passed!
-          Normal = mat3(transpose(inverse(view * model * transform))) * aNormal;
-          Color = aColor;
-        }
-
-    """
-
-    FRAGMENT_SHADER = """
-        #version 330
-
-        in vec3 Normal;
-        in vec3 FragPos;
-        in vec3 Color;
-
-        out vec4 FragColor;
-
-        uniform vec3 lightColor;
-        uniform bool doSpecular;
-
-        void main()
-        {
-          // ambient
-          float ambientStrength = 0.0;
-          vec3 ambient = ambientStrength * lightColor;
-
-          // diffuse
-          vec3 norm = normalize(Normal);
-          // key light (overhead)
-          vec3 lightPos1 = vec3(0.0,5.0,5.0);
-          vec3 lightDir = normalize(lightPos1 - FragPos);
-          float diff = max(dot(norm, lightDir), 0.0);
-          float key = 0.6;
-          vec3 diffuse = key * diff * lightColor;
-
-          // headlight (at camera)
-          vec3 lightPos2 = vec3(0.0,0.0,5.0);
-          lightDir = normalize(lightPos2 - FragPos);
-          vec3 ohlightDir = lightDir;
-          diff = max(dot(norm, lightDir), 0.0);
-          diffuse = diffuse + 0.68  * key * diff * lightColor;
-
-          // fill light (from below)
-          vec3 lightPos3 = vec3(0.0,-5.0,5.0);
-          lightDir = normalize(lightPos3 - FragPos);
-          diff = max(dot(norm, lightDir), 0.0);
-          diffuse = diffuse + 0.6  * key * diff * lightColor;
-
-          // left right back lights
-          vec3 lightPos4 = vec3(5.0,0.0,-5.0);
-          lightDir = normalize(lightPos4 - FragPos);
-          diff = max(dot(norm, lightDir), 0.0);
-          diffuse = diffuse + 0.52 * key * diff * lightColor;
-          vec3 lightPos5 = vec3(-5.0,0.0,-5.0);
-          lightDir = normalize(lightPos5 - FragPos);
-          diff = max(dot(norm, lightDir), 0.0);
-          diffuse = diffuse + 0.52 * key * diff * lightColor;
-
-          // specular
-          vec3 result;
-          if (doSpecular)
-          {
-            float specularStrength = 0.5;
-            // the viewer is always at (0,0,0) in view-space,
-            // so viewDir is (0,0,0) - Position => -Position
-            vec3 viewDir = normalize(-FragPos);
-            vec3 reflectDir = reflect(ohlightDir, norm);
-            float spec = pow(max(dot(viewDir, reflectDir), 0.0), 32);
-            vec3 specular = specularStrength * spec * lightColor;
-            // final color
-            result = (ambient + diffuse + specular) * Color;
-          }
-          else
-          {
-            // final color no specular
-            result = (ambient + diffuse) * Color;
-          }
-          FragColor = vec4(result, 1.0);
-        }
-
-    """
-
-    # Create Vertex Buffer object in gpu
-    VBO = gl.glGenBuffers(1)
-    # Bind the buffer
-    gl.glBindBuffer(gl.GL_ARRAY_BUFFER, VBO)
-    gl.glBufferData(gl.GL_ARRAY_BUFFER, meshdata.nbytes, meshdata, gl.GL_STATIC_DRAW)
-
     # Create Vertex Array object
     VAO = gl.glGenVertexArrays(1)
     # Bind array
     gl.glBindVertexArray(VAO)
+
+    # Create Vertex Buffer object in gpu, holding the interleaved
+    # position | normal | color rows of meshdata (stride 9 floats)
+    VBO = gl.glGenBuffers(1)
+    # Bind the buffer
+    gl.glBindBuffer(gl.GL_ARRAY_BUFFER, VBO)
     gl.glBufferData(gl.GL_ARRAY_BUFFER, meshdata.nbytes, meshdata, gl.GL_STATIC_DRAW)
 
     # Create Element Buffer Object
@@ -542,8 +850,8 @@ def setup_shader(meshdata, triangles, width, height, specular=True):
 
     # Compile The Program and shaders
     shader = gl.shaders.compileProgram(
-        shaders.compileShader(VERTEX_SHADER, gl.GL_VERTEX_SHADER),
-        shaders.compileShader(FRAGMENT_SHADER, gl.GL_FRAGMENT_SHADER),
+        shaders.compileShader(_VERTEX_SHADER, gl.GL_VERTEX_SHADER),
+        shaders.compileShader(_FRAGMENT_SHADER, gl.GL_FRAGMENT_SHADER),
     )
 
     # get the position from shader
@@ -567,23 +875,16 @@ def setup_shader(meshdata, triangles, width, height, specular=True):
 
     gl.glUseProgram(shader)
 
-    gl.glClearColor(0.0, 0.0, 0.0, 1.0)
-    gl.glEnable(gl.GL_DEPTH_TEST)
-
     # Creating Projection Matrix
-    view = pyrr.matrix44.create_from_translation(pyrr.Vector3([0.0, 0.0, -5.0]))
-    projection = pyrr.matrix44.create_perspective_projection(
-        20.0, width / height, 0.1, 100.0
-    )
-    model = pyrr.matrix44.create_from_translation(pyrr.Vector3([0.0, 0.0, 0.0]))
+    projection = _perspective(20.0, width / height, 0.1, 100.0)
 
     # Set matrices in vertex shader
     view_loc = gl.glGetUniformLocation(shader, "view")
     proj_loc = gl.glGetUniformLocation(shader, "projection")
     model_loc = gl.glGetUniformLocation(shader, "model")
-    gl.glUniformMatrix4fv(view_loc, 1, gl.GL_FALSE, view)
+    gl.glUniformMatrix4fv(view_loc, 1, gl.GL_FALSE, _CAMERA)
     gl.glUniformMatrix4fv(proj_loc, 1, gl.GL_FALSE, projection)
-    gl.glUniformMatrix4fv(model_loc, 1, gl.GL_FALSE, model)
+    gl.glUniformMatrix4fv(model_loc, 1, gl.GL_FALSE, _MODEL)
 
     # setup doSpecular in fragment shader
     specular_loc = gl.glGetUniformLocation(shader, "doSpecular")
@@ -596,9 +897,32 @@ def setup_shader(meshdata, triangles, width, height, specular=True):
     return shader
 
 
-def capture_window(width, height):
+def update_geometry(meshdata, triangles):
     """
-    Capture the GL region (0,0) .. (width,height) into PIL Image.
+    Replace the mesh in the buffers set up by :func:`setup_shader`.
+
+    The compiled program, vertex layout and uniforms are kept, so this is
+    much cheaper than calling :func:`setup_shader` again.
+
+    Parameters
+    ----------
+    meshdata : numpy.ndarray
+        Mesh array (shape: n x 9, dtype: np.float32).
+    triangles : numpy.ndarray
+       Triangle indices array (shape: m x 3).
+    """
+    gl.glBufferData(gl.GL_ARRAY_BUFFER, meshdata.nbytes, meshdata, gl.GL_STATIC_DRAW)
+    gl.glBufferData(
+        gl.GL_ELEMENT_ARRAY_BUFFER, triangles.nbytes, triangles, gl.GL_STATIC_DRAW
+    )
+
+
+def capture_window(width, height, buffer=None):
+    """
+    Capture the framebuffer of the current window into PIL Image.
+
+    The whole framebuffer is read. If it is larger than the window (e.g. on
+    high-DPI screens), the image is scaled down to width x height.
 
     Parameters
     ----------
@@ -606,25 +930,96 @@ def capture_window(width, height):
         Window width.
     height : int
         Window height.
+    buffer : numpy.ndarray
+        Optional uint8 array with room for the captured RGB pixels. It is
+        read into instead of allocating a new buffer for every capture; a
+        new buffer is allocated if it is too small.
 
     Returns
     -------
     image: PIL.Image.Image
         Captured image.
     """
-    if sys.platform == "darwin":
-        # not sure why on mac the drawing area is 4 times as large (2x2):
-        width = 2 * width
-        height = 2 * height
-    gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)  # may not be needed
-    img_buf = gl.glReadPixels(0, 0, width, height, gl.GL_RGB, gl.GL_UNSIGNED_BYTE)
-    image = Image.frombytes("RGB", (width, height), img_buf)
-    image = image.transpose(Image.FLIP_TOP_BOTTOM)
-    if sys.platform == "darwin":
-        image.thumbnail((0.5 * width, 0.5 * height), Image.Resampling.LANCZOS)
+    # read exactly what was rendered, its size can differ from the window size
+    fb_width, fb_height = glfw.get_framebuffer_size(glfw.get_current_context())
+    # read the back buffer that was rendered to, the front buffer of a hidden
+    # window is undefined
+    gl.glReadBuffer(gl.GL_BACK)
+    # tightly packed 3-byte RGB rows (width * 3 need not be a multiple of 4)
+    gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+    size = fb_width * fb_height * 3
+    if buffer is None or buffer.size < size:
+        img_buf = gl.glReadPixels(
+            0, 0, fb_width, fb_height, gl.GL_RGB, gl.GL_UNSIGNED_BYTE
+        )
+    else:
+        img_buf = buffer[:size]
+        gl.glReadPixels(
+            0, 0, fb_width, fb_height, gl.GL_RGB, gl.GL_UNSIGNED_BYTE, img_buf
+        )
+    # GL rows start at the bottom: decode with negative stride to flip directly
+    image = Image.frombuffer("RGB", (fb_width, fb_height), img_buf, "raw", "RGB", 0, -1)
+    if fb_width > width or fb_height > height:
+        image.thumbnail((width, height), Image.Resampling.LANCZOS)
     return image
 
 
+@functools.lru_cache(maxsize=8)
+def _load_font(font_file, size):
+    """
+    Load a TrueType font, cached across snapshots.
+
+    Parameters
+    ----------
+    font_file : str
+        Path to the font file, or None for the bundled Roboto font.
+    size : int
+        Font size in pixels.
+
+    Returns
+    -------
+    font: PIL.ImageFont.FreeTypeFont
+        Loaded font.
+    """
+    if font_file is None:
+        font_file = _ROBOTO_PATH
+    return ImageFont.truetype(font_file, size)
+
+
+@functools.lru_cache(maxsize=32)
+def _render_caption(caption, font_file, size):
+    """
+    Rasterize a caption once, cached across snapshots.
+
+    Parameters
+    ----------
+    caption : str
+        Caption text.
+    font_file : str
+        Path to the font file, or None for the bundled Roboto font.
+    size : int
+        Font size in pixels.
+
+    Returns
+    -------
+    text: PIL.Image.Image
+        RGBA image of the light gray caption on a transparent background.
+    offset: tuple
+        Position of the image relative to the text anchor (left, top).
+    length: float
+        Advance length of the caption, for centering.
+    """
+    font = _load_font(font_file, size)
+    # measure and draw with the multiline variants, captions may contain "\n"
+    measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    left, top, right, bottom = measure.multiline_textbbox((0, 0), caption, font=font)
+    text = Image.new("RGBA", (right - left, bottom - top), (220, 220, 220, 0))
+    ImageDraw.Draw(text).multiline_text(
+        (-left, -top), caption, (220, 220, 220), font=font
+    )
+    return text, (left, top), font.getlength(caption)
+
+
 def create_colorbar(fmin, fmax, invert, neg=True, font_file=None):
     """
     Create colorbar image with text indicating min and max values.
@@ -650,7 +1045,6 @@ def create_colorbar(fmin, fmax, invert, neg=True, font_file=None):
     cwidth = 200
     cheight = 30
     # img = Image.new("RGB", (cwidth, cheight), color=(90, 90, 90))
-    values = np.nan * np.ones(cwidth)
     gapspace = 0
     if fmin > 0.01:
         # leave gray gap
@@ -662,74 +1056,67 @@ def create_colorbar(fmin, fmax, invert, neg=True, font_file=None):
         num = num * 2
         gapspace = gapspace * 2
     vals = np.linspace(0.01, 1, num)
-    if not neg:
-        values[-vals.size :] = vals
-    else:
-        values[: vals.size] = -1.0 * np.flip(vals)
-        values[-vals.size :] = vals
-
-    colors = heat_color(values, invert)
-    colors[np.isnan(values), :] = 0.33 * np.ones((1, 3))
-    img_bar = np.uint8(np.tile(colors, (cheight, 1, 1)) * 255)
-    # pad with black
-    img_buf = np.zeros((cheight + 20, cwidth + 20, 3), dtype=np.uint8)
-    img_buf[3 : cheight + 3, 10 : cwidth + 10, :] = img_bar
+    # gray row, only the colored ends go through heat_color
+    img_bar = np.full((cwidth, 3), np.uint8(0.33 * 255), dtype=np.uint8)
+    # scale straight into the uint8 row, without a float temporary
+    np.multiply(
+        heat_color(vals, invert), 255, out=img_bar[-vals.size :], casting="unsafe"
+    )
+    if neg:
+        np.multiply(
+            heat_color(-vals[::-1], invert),
+            255,
+            out=img_bar[: vals.size],
+            casting="unsafe",
+        )
+    # broadcast the row to all rows of the bar and pad with black,
+    # writing each pixel of the buffer only once
+    img_bar = np.broadcast_to(img_bar, (cheight, cwidth, 3))
+    img_buf = np.pad(img_bar, ((3, 17), (10, 10), (0, 0)))
     image = Image.fromarray(img_buf)
 
-    if font_file is None:
-        script_dir = "/".join(str(__file__).split("/")[:-1])
-        font_file = os.path.join(script_dir, "Roboto-Regular.ttf")
-    font = ImageFont.truetype(font_file, 12)
+    font = _load_font(font_file, 12)
+    draw = ImageDraw.Draw(image)
     if neg:
         # Left
         caption = f" <{-fmax:.2f}"
         xpos = 0  # 10- 0.5*(font.getlength(caption))
-        ImageDraw.Draw(image).text(
-            (xpos, image.height - 17), caption, (220, 220, 220), font=font
-        )
+        draw.text((xpos, image.height - 17), caption, (220, 220, 220), font=font)
         # Right
         caption = f">{fmax:.2f} "
         xpos = image.width - (font.getlength(caption))
-        ImageDraw.Draw(image).text(
-            (xpos, image.height - 17), caption, (220, 220, 220), font=font
-        )
+        draw.text((xpos, image.height - 17), caption, (220, 220, 220), font=font)
         if gapspace == 0:
             caption = "0"
             xpos = 0.5 * image.width - 0.5 * font.getlength(caption)
-            ImageDraw.Draw(image).text(
-                (xpos, image.height - 17), caption, (220, 220, 220), font=font
-            )
+            draw.text((xpos, image.height - 17), caption, (220, 220, 220), font=font)
         else:
             caption = f"{-fmin:.2f}"
             xpos = 0.5 * image.width - 0.5 * font.getlength(caption) - gapspace - 5
-            ImageDraw.Draw(image).text(
-                (xpos, image.height - 17), caption, (220, 220, 220), font=font
-            )
+            draw.text((xpos, image.height - 17), caption, (220, 220, 220), font=font)
             caption = f"{fmin:.2f}"
             xpos = 0.5 * image.width - 0.5 * font.getlength(caption) + gapspace + 5
-            ImageDraw.Draw(image).text(
-                (xpos, image.height - 17), caption, (220, 220, 220), font=font
-            )
+            draw.text((xpos, image.height - 17), caption, (220, 220, 220), font=font)
     else:
         # Right
         caption = f">{fmax:.2f} "
         xpos = image.width - (font.getlength(caption))
-        ImageDraw.Draw(image).text(
-            (xpos, image.height - 17), caption, (220, 220, 220), font=font
-        )
+        draw.text((xpos, image.height - 17), caption, (220, 220, 220), font=font)
         # Left
         caption = f" {fmin:.2f}"
         xpos = gapspace
         if gapspace == 0:
             caption = " 0"
             xpos = 5
-        ImageDraw.Draw(image).text(
-            (xpos, image.height - 17), caption, (220, 220, 220), font=font
-        )
+        draw.text((xpos, image.height - 17), caption, (220, 220, 220), font=font)
 
     return image
 
 
+# colorbars only depend on their arguments, reuse them across snapshots
+_cached_colorbar = functools.lru_cache(maxsize=16)(create_colorbar)
+
+
 def snap4(
     lhoverlaypath,
     rhoverlaypath,
@@ -745,6 +1132,7 @@ def snap4(
     outpath=None,
     font_file=None,
     specular=True,
+    session=None,
 ):
     """
     Snap four views (front and back for left and right hemispheres).
@@ -781,6 +1169,10 @@ def snap4(
         Path to the file describing the font to be used in captions.
     specular : bool
         Specular is by default set as True.
+    session : _GLSession
+        Open session (see :func:`snap_session`) whose window is reused.
+        If None, a shared hidden session is created on first use and kept
+        open until the interpreter exits.
 
     Returns
     -------
@@ -791,40 +1183,34 @@ def snap4(
     # (keep aspect ratio, as the mesh scale and distances are set accordingly)
     wwidth = 540
     weight = 450
-    visible = False
-    window = init_window(wwidth, weight, "WhipperSnapPy 2.0", visible)
-    if not window:
-        return False  # need raise error here in future
-
-    # set up matrices to show object left and right side:
-    rot_z = pyrr.Matrix44.from_z_rotation(-0.5 * math.pi)
-    rot_x = pyrr.Matrix44.from_x_rotation(0.5 * math.pi)
-    # rot_y = pyrr.Matrix44.from_y_rotation(math.pi/6)
-    viewLeft = rot_x * rot_z
-    rot_y = pyrr.Matrix44.from_y_rotation(math.pi)
-    viewRight = rot_y * viewLeft
-    transl = pyrr.Matrix44.from_translation((0, 0, 0.4))
-
+    if session is None:
+        session = _get_default_session(2 * wwidth, 2 * weight)
+        if session is None:
+            return False  # need raise error here in future
+    elif not session.open():
+        # sessions used without "with" are opened here
+        return False
+    paths = {}
     for hemi in ("lh", "rh"):
         if surfname is None:
-            print(
-                "[INFO] No surf_name provided. Looking for options in surf directory..."
+            logger.info(
+                "No surf_name provided. Looking for options in surf directory..."
             )
 
             if sdir is None:
                 sdir = os.environ.get("SUBJECTS_DIR")
                 if not sdir:
-                    print(
-                        "[INFO] No surf_name or subjects directory (sdir) \
-provided, can not find surf file"
+                    logger.error(
+                        "No surf_name or subjects directory (sdir) provided, "
+                        "can not find surf file"
                     )
                     sys.exit(1)
 
             found_surfname = get_surf_name(sdir, hemi)
 
             if found_surfname is None:
-                print(
-                    f"[ERROR] Could not find valid surface in {sdir} for hemi: {hemi}!"
+                logger.error(
+                    "Could not find valid surface in %s for hemi: %s!", sdir, hemi
                 )
                 sys.exit(1)
             meshpath = os.path.join(sdir, "surf", hemi + "." + found_surfname)
@@ -841,66 +1227,90 @@ provided, can not find surf file"
             overlaypath = lhoverlaypath
         else:
             overlaypath = rhoverlaypath
+        paths[hemi] = (meshpath, overlaypath, curvpath, labelpath)
+
+    # all four views are rendered as tiles of one framebuffer (lateral views
+    # on top, medial views below, left hemisphere in the left column) and
+    # read back at once
+    with _gl_lock:
+        try:
+            session.resize(2 * wwidth, 2 * weight)
+            fb_width, fb_height = glfw.get_framebuffer_size(session.window)
+            tile_width = fb_width // 2
+            tile_height = fb_height // 2
+            gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+
+            # load and colorize data in worker threads (GL calls stay in this one)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+                futures = {
+                    "lh": pool.submit(
+                        prepare_geometry, *paths["lh"], fthresh, fmax, invert
+                    )
+                }
+                if fthresh is None or fmax is None:
+                    # rh is colored with the thresholds determined from lh
+                    _, _, fthresh, fmax, _ = futures["lh"].result()
+                futures["rh"] = pool.submit(
+                    prepare_geometry, *paths["rh"], fthresh, fmax, invert
+                )
 
-        # load and colorzie data
-        meshdata, triangles, fthresh, fmax, neg = prepare_geometry(
-            meshpath, overlaypath, curvpath, labelpath, fthresh, fmax, invert
-        )
-        # upload to GPU and compile shaders
-        shader = setup_shader(meshdata, triangles, wwidth, weight, specular=specular)
-
-        # draw
-        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
-        transformLoc = gl.glGetUniformLocation(shader, "transform")
-        viewmat = viewLeft
-        if hemi == "lh":
-            viewmat = transl * viewmat
-        gl.glUniformMatrix4fv(transformLoc, 1, gl.GL_FALSE, viewmat)
-        gl.glDrawElements(gl.GL_TRIANGLES, triangles.size, gl.GL_UNSIGNED_INT, None)
-
-        im1 = capture_window(wwidth, weight)
-
-        glfw.swap_buffers(window)
-        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
-        viewmat = viewRight
-        if hemi == "rh":
-            viewmat = transl * viewmat
-        gl.glUniformMatrix4fv(transformLoc, 1, gl.GL_FALSE, viewmat)
-        gl.glDrawElements(gl.GL_TRIANGLES, triangles.size, gl.GL_UNSIGNED_INT, None)
-
-        im2 = capture_window(wwidth, weight)
-
-        if hemi == "lh":
-            lhimg = Image.new("RGB", (im1.width, im1.height + im2.height))
-            lhimg.paste(im1, (0, 0))
-            lhimg.paste(im2, (0, im1.height))
-        else:
-            rhimg = Image.new("RGB", (im1.width, im1.height + im2.height))
-            rhimg.paste(im2, (0, 0))
-            rhimg.paste(im1, (0, im2.height))
-
-    image = Image.new("RGB", (lhimg.width + rhimg.width, lhimg.height))
-    image.paste(lhimg, (0, 0))
-    image.paste(rhimg, (im1.width, 0))
+                for hemi in ("lh", "rh"):
+                    meshdata, triangles, fthresh, fmax, neg = futures[hemi].result()
+                    if session.shader is None:
+                        # upload to GPU and compile shaders (once per session)
+                        session.shader = setup_shader(
+                            meshdata, triangles, wwidth, weight, specular=specular
+                        )
+                    else:
+                        # keep program and buffers, only replace the mesh
+                        update_geometry(meshdata, triangles)
+                    shader = session.shader
+                    gl.glUniform1i(
+                        gl.glGetUniformLocation(shader, "doSpecular"), specular
+                    )
+                    transformLoc = gl.glGetUniformLocation(shader, "transform")
+
+                    # draw
+                    if hemi == "lh":
+                        tiles = (
+                            (_VIEW_LH_LATERAL, 0, tile_height),
+                            (_VIEW_LH_MEDIAL, 0, 0),
+                        )
+                    else:
+                        tiles = (
+                            (_VIEW_RH_LATERAL, tile_width, tile_height),
+                            (_VIEW_RH_MEDIAL, tile_width, 0),
+                        )
+                    for viewmat, xpos, ypos in tiles:
+                        gl.glViewport(xpos, ypos, tile_width, tile_height)
+                        gl.glUniformMatrix4fv(transformLoc, 1, gl.GL_FALSE, viewmat)
+                        gl.glDrawElements(
+                            gl.GL_TRIANGLES, triangles.size, gl.GL_UNSIGNED_INT, None
+                        )
+
+            gl.glViewport(0, 0, fb_width, fb_height)
+            # capture_window reads the whole framebuffer the tiles were laid out in
+            if session.pixels is None or session.pixels.size < fb_width * fb_height * 3:
+                session.pixels = np.empty(fb_width * fb_height * 3, dtype=np.uint8)
+            image = capture_window(2 * wwidth, 2 * weight, session.pixels)
+        finally:
+            # release the context, so the next snapshot can run in any thread
+            glfw.make_context_current(None)
 
     if caption:
-        if font_file is None:
-            script_dir = "/".join(str(__file__).split("/")[:-1])
-            font_file = os.path.join(script_dir, "Roboto-Regular.ttf")
-        font = ImageFont.truetype(font_file, 20)
-        xpos = 0.5 * (image.width - font.getlength(caption))
-        ImageDraw.Draw(image).text(
-            (xpos, image.height - 40), caption, (220, 220, 220), font=font
-        )
+        text, (left, top), length = _render_caption(caption, font_file, 20)
+        # round like ImageDraw.text, so the result matches drawing directly
+        xpos = int(0.5 * (image.width - length) + 0.5) + left
+        image.paste(text, (xpos, image.height - 40 + top), text)
 
     if colorbar:
-        bar = create_colorbar(fthresh, fmax, invert, neg)
+        bar = _cached_colorbar(fthresh, fmax, invert, neg)
         xpos = int(0.5 * (image.width - bar.width))
         ypos = int(0.5 * (image.height - bar.height))
         image.paste(bar, (xpos, ypos))
 
     if outpath:
-        print(f"[INFO] Saving snapshot to {outpath}")
+        logger.info("Saving snapshot to %s", outpath)
         image.save(outpath)
 
 
@@ -924,9 +1334,9 @@ def get_surf_name(sdir, hemi):
     """
     for surf_name_option in ["pial_semi_inflated", "white", "inflated"]:
         if os.path.exists(os.path.join(sdir, "surf", hemi + "." + surf_name_option)):
-            print("[INFO] Found {}".format(hemi + "." + surf_name_option))
+            logger.info("Found %s.%s", hemi, surf_name_option)
             return surf_name_option
         else:
-            print("[INFO] No {} file found".format(hemi + "." + surf_name_option))
+            logger.debug("No %s.%s file found", hemi, surf_name_option)
     else:
         return None
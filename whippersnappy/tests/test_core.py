@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+import pytest
+
+# core needs the OpenGL bindings at import time (no context is created)
+pytest.importorskip("glfw")
+pytest.importorskip("OpenGL.GL")
+
+from ..core import (  # noqa: E402
+    binary_color,
+    create_colorbar,
+    heat_color,
+    mask_label,
+    rescale_overlay,
+)
+
+
+def _heat_color_reference(values, invert=False):
+    """Piecewise heat map with the six value ranges spelled out."""
+    if invert:
+        values = -1.0 * values
+    vabs = np.abs(values)
+    colors = np.zeros((vabs.size, 3), dtype=np.float32)
+    crb = 0.5625 + 3 * 0.4375 * vabs
+    cg = 1.5 * (vabs - (1.0 / 3.0))
+    n1 = values < -1.0
+    nm = (values >= -1.0) & (values < -(1.0 / 3.0))
+    n0 = (values >= -(1.0 / 3.0)) & (values < 0)
+    p0 = (values >= 0) & (values < (1.0 / 3.0))
+    pm = (values >= (1.0 / 3.0)) & (values < 1.0)
+    p1 = values >= 1.0
+    colors[n1, 1:3] = 1.0
+    colors[nm, 1] = cg[nm]
+    colors[nm, 2] = 1.0
+    colors[n0, 2] = crb[n0]
+    colors[p0, 0] = crb[p0]
+    colors[pm, 1] = cg[pm]
+    colors[pm, 0] = 1.0
+    colors[p1, 0:2] = 1.0
+    colors[np.isnan(values), :] = np.nan
+    return colors
+
+
+@pytest.mark.parametrize(
+    ("value", "color", "inverted"),
+    [
+        (0.0, (0.5625, 0, 0), (0.5625, 0, 0)),
+        (-0.0, (0.5625, 0, 0), (0.5625, 0, 0)),
+        (0.1, (0.69375, 0, 0), (0, 0, 0.69375)),
+        (1 / 3, (1, 0, 0), (0, 0, 1)),
+        (-1 / 3, (0, 0, 1), (1, 0, 0)),
+        (0.5, (1, 0.25, 0), (0, 0.25, 1)),
+        (-0.5, (0, 0.25, 1), (1, 0.25, 0)),
+        (1.0, (1, 1, 0), (0, 1, 1)),
+        (-1.0, (0, 1, 1), (1, 1, 0)),
+        (2.0, (1, 1, 0), (0, 1, 1)),
+        (-2.0, (0, 1, 1), (1, 1, 0)),
+    ],
+)
+def test_heat_color_values(value, color, inverted):
+    """Test heat colors at the range boundaries, for both directions."""
+    values = np.array([value])
+    np.testing.assert_allclose(heat_color(values)[0], color, atol=1e-6)
+    np.testing.assert_allclose(heat_color(values, invert=True)[0], inverted, atol=1e-6)
+
+
+def test_heat_color_nan():
+    """Test that masked values map to masked colors."""
+    colors = heat_color(np.array([np.nan, 0.5]))
+    assert colors.dtype == np.float32
+    assert np.isnan(colors[0]).all()
+    assert not np.isnan(colors[1]).any()
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("invert", [False, True])
+def test_heat_color_reference(dtype, invert):
+    """Test that heat colors match the piecewise map bit for bit."""
+    values = np.linspace(-1.5, 1.5, 3001).astype(dtype)
+    edges = np.array([-1, -1 / 3, -0.0, 0, 1 / 3, 1, np.nan], dtype=dtype)
+    values = np.concatenate((values, edges, -edges))
+    np.testing.assert_array_equal(
+        heat_color(values, invert), _heat_color_reference(values, invert)
+    )
+
+
+def test_rescale_overlay():
+    """Test masking, shifting and scaling of overlay values."""
+    values = np.array([-4.0, -3.0, -1.0, 0.0, 1.0, 2.0, 3.0, 4.0], dtype=np.float32)
+    original = values.copy()
+    rescaled, minval, maxval, neg = rescale_overlay(values, 2.0, 4.0)
+    np.testing.assert_array_equal(values, original)
+    assert rescaled.dtype == np.float32
+    np.testing.assert_array_equal(
+        rescaled, [-1.0, -0.5, np.nan, np.nan, np.nan, 0.0, 0.5, 1.0]
+    )
+    assert (minval, maxval) == (2.0, 4.0)
+    assert neg
+
+
+def test_rescale_overlay_neg():
+    """Test that neg only reports negative values beyond the threshold."""
+    values = np.array([-1.0, 0.5, 2.0, 4.0])
+    assert not rescale_overlay(values, 2.0, 4.0)[3]
+    values = np.array([-3.0, 0.5, 2.0, 4.0])
+    assert rescale_overlay(values, 2.0, 4.0)[3]
+    # without thresholds, the range of the absolute values is used
+    rescaled, minval, maxval, neg = rescale_overlay(np.array([1.0, 2.0, 5.0]))
+    assert (minval, maxval) == (1.0, 5.0)
+    np.testing.assert_allclose(rescaled, [0.0, 0.25, 1.0])
+    assert not neg
+
+
+def test_binary_color():
+    """Test the threshold colormap, including masked values."""
+    values = np.array([-1.0, 0.0, 0.5, np.nan])
+    colors = binary_color(values, 0.0, 0.2, (1.0, 0.0, 0.0))
+    assert colors.shape == (4, 3)
+    assert colors.dtype == np.float32
+    np.testing.assert_allclose(colors[0], 0.2)
+    np.testing.assert_array_equal(colors[1:3], [[1, 0, 0], [1, 0, 0]])
+    # nan is not above the threshold, so it gets the low color
+    np.testing.assert_allclose(colors[3], 0.2)
+
+
+def test_mask_label_replaced_file(tmp_path):
+    """Test that a label replaced with the same mtime is read again."""
+    labelpath = tmp_path / "lh.cortex.label"
+    labelpath.write_text("#!ascii label\n2\n1 0 0 0 0\n3 0 0 0 0\n")
+    stat = labelpath.stat()
+    masked = mask_label(np.arange(5.0), str(labelpath))
+    np.testing.assert_array_equal(np.isnan(masked), [1, 0, 1, 0, 1])
+    # replace the file, keeping its timestamps (as cp -p or rsync -a do)
+    replacement = tmp_path / "new.label"
+    replacement.write_text("#!ascii label\n3\n0 0 0 0 0\n2 0 0 0 0\n4 0 0 0 0\n")
+    replacement.replace(labelpath)
+    os.utime(labelpath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    masked = mask_label(np.arange(5.0), str(labelpath))
+    np.testing.assert_array_equal(np.isnan(masked), [0, 1, 0, 1, 0])
+
+
+@pytest.mark.parametrize(
+    ("args", "bar_sums"),
+    [
+        ((2.0, 4.0, False, True), (677040, 514320, 677040)),
+        ((2.0, 4.0, True, True), (677040, 514320, 677040)),
+        ((0.0, 4.0, False, True), (710370, 515760, 710370)),
+        ((2.0, 4.0, False, False), (1274940, 512940, 80640)),
+        ((0.0, 4.0, True, False), (0, 514410, 1422090)),
+    ],
+)
+def test_create_colorbar(args, bar_sums):
+    """Test colorbar size, color gradient and the presence of labels."""
+    image = np.asarray(create_colorbar(*args)).astype(np.int64)
+    assert image.shape == (50, 220, 3)
+    # the bar itself, without the font-dependent labels below it
+    assert tuple(image[3:33, 10:210].sum(axis=(0, 1))) == bar_sums
+    assert image[:3].sum() == 0
+    assert image[33:].sum() > 0